@@ -1,22 +1,55 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash
+from flask import Flask, render_template, request, redirect, url_for, session, flash, make_response
 from user import User
 from trip import Trip
-from database import DatabaseManager
+from database import DatabaseManager, verify_password
+import hashlib
 import os
+import sys
+
+# Form keys interned once at import so every request.form lookup is a
+# pointer-compare dict hit rather than a fresh string hash
+_K_NAME = sys.intern('name')
+_K_EMAIL = sys.intern('email')
+_K_PASSWORD = sys.intern('password')
+_K_CONFIRM_PASSWORD = sys.intern('confirm_password')
+_K_CITY = sys.intern('city')
+_K_STATE = sys.intern('state')
+_K_COUNTRY = sys.intern('country')
+_K_START_DATE = sys.intern('start_date')
+_K_END_DATE = sys.intern('end_date')
+_K_TYPE = sys.intern('type')
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-change-this-in-production'
 
+# Templates never change at runtime: skip the per-request mtime checks,
+# cache compiled templates without bound, and compile them all at boot
+app.config['TEMPLATES_AUTO_RELOAD'] = False
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 31536000
+app.jinja_env.auto_reload = False
+app.jinja_env.cache = {}
+for _template_name in app.jinja_env.list_templates():
+    app.jinja_env.get_template(_template_name)
+
 # Initialize database manager
 db = DatabaseManager()
 
 # Populate with sample data if database is empty
 db.populate_sample_data()
 
+# Endpoints reachable without a login session
+AUTH_EXEMPT = {'index', 'login', 'sign_up', 'static'}
+
+@app.before_request
+def require_login():
+    """Redirect to login for any non-exempt endpoint without a session"""
+    if request.endpoint not in AUTH_EXEMPT and 'user_id' not in session:
+        return redirect(url_for('login'))
+
 @app.route('/')
 def index():
     """Home page - redirect to login if not authenticated"""
-    if 'user_email' in session:
+    if 'user_id' in session:
         return redirect(url_for('dashboard'))
     return redirect(url_for('login'))
 
@@ -24,12 +57,16 @@ def index():
 def login():
     """Login page"""
     if request.method == 'POST':
-        email = request.form['email']
-        password = request.form['password']
+        form = request.form
+        email = form[_K_EMAIL]
+        password = form[_K_PASSWORD]
         
         user = db.get_user_by_email(email)
-        if user and user.password == password:
+        if user and verify_password(password, user.password):
+            # Cache id and name so routes don't have to look them up again
             session['user_email'] = email
+            session['user_id'] = user.id
+            session['user_name'] = user.name
             flash('Login successful!', 'success')
             return redirect(url_for('dashboard'))
         else:
@@ -41,20 +78,23 @@ def login():
 def sign_up():
     """Sign up page"""
     if request.method == 'POST':
-        name = request.form['name']
-        email = request.form['email']
-        password = request.form['password']
-        confirm_password = request.form['confirm_password']
+        form = request.form
+        name = form[_K_NAME]
+        email = form[_K_EMAIL]
+        password = form[_K_PASSWORD]
+        confirm_password = form[_K_CONFIRM_PASSWORD]
 
-        if db.get_user_by_email(email):
-            flash('Email already exists', 'error')
-            return redirect(url_for('sign_up'))
-        if not name or not email or not password or not confirm_password:
+        # Cheap in-memory checks first; only a fully-formed submission
+        # costs a database lookup
+        if not (name and email and password and confirm_password):
             flash('Please fill in all fields', 'error')
             return redirect(url_for('sign_up'))
         if password != confirm_password:
             flash('Passwords do not match', 'error')
             return redirect(url_for('sign_up'))
+        if db.get_user_by_email(email):
+            flash('Email already exists', 'error')
+            return redirect(url_for('sign_up'))
         user =  db.create_user(name, email, password)
         if user:
             flash('Sign up successful!', 'success')
@@ -65,106 +105,95 @@ def sign_up():
 def logout():
     """Logout and clear session"""
     session.pop('user_email', None)
+    session.pop('user_id', None)
+    session.pop('user_name', None)
     flash('You have been logged out', 'info')
     return redirect(url_for('login'))
 
 @app.route('/dashboard')
 def dashboard():
     """User dashboard showing trips"""
-    if 'user_email' not in session:
-        return redirect(url_for('login'))
-    
-    user = db.get_user_by_email(session['user_email'])
-    if not user:
-        flash('User not found', 'error')
-        return redirect(url_for('login'))
-    
-    user_id = db.get_user_id_by_email(session['user_email'])
+    user_id = session['user_id']
     trips = db.get_user_trips(user_id)
-    
-    return render_template('dashboard.html', user=user, trips=trips)
+
+    # ETag over the trip rows lets an unchanged reload skip the template
+    # render entirely. Responses carrying flash messages stay uncached so
+    # a 304 can never replay a stale alert.
+    fingerprint = ';'.join(','.join(map(str, tuple(trip))) for trip in trips)
+    etag = hashlib.blake2b(f'{user_id}:{fingerprint}'.encode(),
+                           digest_size=8).hexdigest()
+    has_flash = bool(session.get('_flashes'))
+
+    if not has_flash and request.if_none_match.contains(etag):
+        return '', 304
+
+    user = {'name': session['user_name'], 'email': session['user_email']}
+    response = make_response(render_template('dashboard.html', user=user, trips=trips))
+    if not has_flash:
+        response.set_etag(etag)
+    return response
 
 @app.route('/add_trip', methods=['GET', 'POST'])
 def add_trip():
     """Add a new trip"""
-    if 'user_email' not in session:
-        return redirect(url_for('login'))
-    
     if request.method == 'POST':
-        city = request.form['city']
-        state = request.form['state']
-        country = request.form['country']
-        start_date = request.form['start_date']
-        end_date = request.form['end_date']
-        trip_type = request.form['type']
-        
+        form = request.form
+        city = form[_K_CITY]
+        state = form[_K_STATE]
+        country = form[_K_COUNTRY]
+        start_date = form[_K_START_DATE]
+        end_date = form[_K_END_DATE]
+        trip_type = form[_K_TYPE]
+
         # Create new trip
         new_trip = Trip(city, state, country, start_date, end_date, trip_type)
         
         # Add to user's trips
-        user_id = db.get_user_id_by_email(session['user_email'])
-        db.create_trip(user_id, city, state, country, start_date, end_date, trip_type)
+        db.create_trip(session['user_id'], city, state, country, start_date, end_date, trip_type)
         
         flash('Trip added successfully!', 'success')
         return redirect(url_for('dashboard'))
     
     return render_template('add_trip.html')
 
-@app.route('/edit_trip/<int:trip_index>', methods=['GET', 'POST'])
-def edit_trip(trip_index):
+@app.route('/edit_trip/<int:trip_id>', methods=['GET', 'POST'])
+def edit_trip(trip_id):
     """Edit an existing trip"""
-    if 'user_email' not in session:
-        return redirect(url_for('login'))
-    
-    user = db.get_user_by_email(session['user_email'])
-    if not user:
-        flash('User not found', 'error')
-        return redirect(url_for('login'))
-    
-    user_id = db.get_user_id_by_email(session['user_email'])
-    trips = db.get_user_trips(user_id)
-    
-    if trip_index >= len(trips):
+    trip = db.get_user_trip(trip_id, session['user_id'])
+
+    if not trip:
         flash('Trip not found', 'error')
         return redirect(url_for('dashboard'))
-    
-    trip = db.get_trip_by_id(trips[trip_index].id)
-    
+
     if request.method == 'POST':
-        city = request.form['city']
-        state = request.form['state']
-        country = request.form['country']
-        start_date = request.form['start_date']
-        end_date = request.form['end_date']
-        trip_type = request.form['type']
-        db.update_trip(trip.id, city=city, state=state, country=country, start_date=start_date, end_date=end_date, type=trip_type)
+        form = request.form
+        city = form[_K_CITY]
+        state = form[_K_STATE]
+        country = form[_K_COUNTRY]
+        start_date = form[_K_START_DATE]
+        end_date = form[_K_END_DATE]
+        trip_type = form[_K_TYPE]
+        db.update_trip(trip.id, city=city, state=state, country=country, start_date=start_date, end_date=end_date, trip_type=trip_type)
         flash('Trip updated successfully!', 'success')
         return redirect(url_for('dashboard'))
     
-    return render_template('edit_trip.html', trip=trip, trip_index=trip_index)
+    return render_template('edit_trip.html', trip=trip)
 
-@app.route('/delete_trip/<int:trip_index>')
-def delete_trip(trip_index):
+@app.route('/delete_trip/<int:trip_id>')
+def delete_trip(trip_id):
     """Delete a trip"""
-    if 'user_email' not in session:
-        return redirect(url_for('login'))
-    
-    user = db.get_user_by_email(session['user_email'])
-    if not user:
-        flash('User not found', 'error')
-        return redirect(url_for('login'))
-    
-    user_id = db.get_user_id_by_email(session['user_email'])
-    trips = db.get_user_trips(user_id)
-    
-    if trip_index >= len(trips):
+    trip = db.get_user_trip(trip_id, session['user_id'])
+
+    if not trip:
         flash('Trip not found', 'error')
     else:
-        trip = db.get_trip_by_id(trips[trip_index].id)
         db.delete_trip(trip.id)
         flash('Trip deleted successfully!', 'success')
     
     return redirect(url_for('dashboard'))
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5001)
+    # Serve through waitress: multi-threaded, no debug overhead, and no
+    # file-watching reloader. Pairs with the per-thread DB connections.
+    from waitress import serve
+    serve(app, host='0.0.0.0', port=5001, threads=8)
@@ -1,9 +1,70 @@
 import sqlite3
 import os
+import hashlib
+import hmac
+import threading
 from contextlib import contextmanager
 from user import User
 from trip import Trip
 
+# scrypt parameters, tuned so a verify costs ~50ms (memory-hard, computed in C)
+_SCRYPT_PARAMS = {'n': 2 ** 14, 'r': 8, 'p': 1}
+
+
+def hash_password(password):
+    """
+    Hash a password with scrypt and a random salt.
+
+    Args:
+        password (str): Plaintext password
+
+    Returns:
+        str: Storable hash in 'scrypt$<salt hex>$<digest hex>' form
+    """
+    salt = os.urandom(16)
+    digest = hashlib.scrypt(password.encode(), salt=salt, **_SCRYPT_PARAMS)
+    return f"scrypt${salt.hex()}${digest.hex()}"
+
+
+def verify_password(password, stored):
+    """
+    Check a plaintext password against a stored scrypt hash.
+
+    Args:
+        password (str): Plaintext password to check
+        stored (str): Hash previously produced by hash_password
+
+    Returns:
+        bool: True if the password matches
+    """
+    try:
+        _, salt_hex, digest_hex = stored.split('$')
+        salt = bytes.fromhex(salt_hex)
+        expected = bytes.fromhex(digest_hex)
+    except (AttributeError, ValueError):
+        return False  # Malformed or legacy plaintext value
+    digest = hashlib.scrypt(password.encode(), salt=salt, **_SCRYPT_PARAMS)
+    return hmac.compare_digest(digest, expected)
+
+
+# Hot-path SQL as module-level constants: stable string identity keeps
+# sqlite3's per-connection statement cache hitting on every call
+SQL_CREATE_USER = 'INSERT INTO users (name, email, password) VALUES (?, ?, ?)'
+SQL_GET_USER_BY_EMAIL = 'SELECT * FROM users WHERE email = ?'
+SQL_GET_USER_BY_ID = 'SELECT * FROM users WHERE id = ?'
+SQL_UPDATE_USER = ('UPDATE users SET name = COALESCE(?, name), email = COALESCE(?, email), '
+                   'password = COALESCE(?, password) WHERE id = ?')
+SQL_DELETE_USER = 'DELETE FROM users WHERE id = ?'
+SQL_CREATE_TRIP = ('INSERT INTO trips (user_id, city, state, country, start_date, end_date, type) '
+                   'VALUES (?, ?, ?, ?, ?, ?, ?)')
+SQL_GET_USER_TRIPS = 'SELECT * FROM trips WHERE user_id = ? ORDER BY created_at DESC'
+SQL_GET_TRIP_BY_ID = 'SELECT * FROM trips WHERE id = ?'
+SQL_GET_USER_TRIP = 'SELECT * FROM trips WHERE id = ? AND user_id = ?'
+SQL_UPDATE_TRIP = ('UPDATE trips SET city = COALESCE(?, city), state = COALESCE(?, state), '
+                   'country = COALESCE(?, country), start_date = COALESCE(?, start_date), '
+                   'end_date = COALESCE(?, end_date), type = COALESCE(?, type) WHERE id = ?')
+SQL_DELETE_TRIP = 'DELETE FROM trips WHERE id = ?'
+
 class DatabaseManager:
     """
     SQLite database manager for Tourley application.
@@ -12,20 +73,41 @@ class DatabaseManager:
     
     def __init__(self, db_path="tourley.db"):
         self.db_path = db_path
+        self._local = threading.local()  # One persistent connection per thread
         self.init_database()
-    
+
     @contextmanager
     def get_connection(self):
         """
         Context manager for database connections.
-        Automatically handles connection cleanup.
+        Reuses one long-lived connection per thread instead of opening
+        and closing a fresh one on every query.
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Enable column access by name
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # URI form so open behavior is explicit. Not cache=shared: its
+            # table-level locks ignore the busy timeout and make concurrent
+            # threads fail with 'database table is locked'; the mmap window
+            # already shares pages across connections via the OS cache.
+            conn = sqlite3.connect(f'file:{self.db_path}?mode=rwc',
+                                   uri=True, check_same_thread=False,
+                                   isolation_level=None, cached_statements=256)
+            conn.row_factory = sqlite3.Row  # Enable column access by name
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute('PRAGMA cache_size=-20000')
+            conn.execute('PRAGMA mmap_size=268435456')
+            self._local.conn = conn
         try:
             yield conn
-        finally:
-            conn.close()
+        except Exception:
+            # The connection outlives the request; never leave it stuck
+            # inside a transaction a failed write opened
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
     
     def init_database(self):
         """
@@ -33,7 +115,10 @@ class DatabaseManager:
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            
+
+            # Only takes effect on a fresh database file (before first table)
+            cursor.execute('PRAGMA page_size=4096')
+
             # Create users table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS users (
@@ -61,11 +146,13 @@ class DatabaseManager:
                 )
             ''')
             
-            # Create indexes for better performance
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_trips_user_id ON trips(user_id)')
+            # Create indexes for better performance.
+            # The composite index matches get_user_trips' WHERE + ORDER BY,
+            # so rows stream out in order without a separate sort pass.
+            cursor.execute('DROP INDEX IF EXISTS idx_trips_user_id')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_trips_user_created ON trips(user_id, created_at DESC)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)')
-            
-            conn.commit()
+            cursor.execute('ANALYZE')
     
     # User operations
     def create_user(self, name, email, password):
@@ -80,17 +167,16 @@ class DatabaseManager:
         Returns:
             int: User ID if successful, None if failed
         """
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO users (name, email, password)
-                    VALUES (?, ?, ?)
-                ''', (name, email, password))
-                conn.commit()
-                return cursor.lastrowid
-        except sqlite3.IntegrityError:
-            return None  # Email already exists
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                cursor.execute(SQL_CREATE_USER, (name, email, hash_password(password)))
+            except sqlite3.IntegrityError:
+                cursor.execute('ROLLBACK')
+                return None  # Email already exists
+            cursor.execute('COMMIT')
+            return cursor.lastrowid
     
     def get_user_by_email(self, email):
         """
@@ -104,15 +190,17 @@ class DatabaseManager:
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM users WHERE email = ?', (email,))
+            cursor.execute(SQL_GET_USER_BY_EMAIL, (email,))
             row = cursor.fetchone()
-            
+
             if row:
-                return User(
+                user = User(
                     name=row['name'],
                     email=row['email'],
                     password=row['password']
                 )
+                user.id = row['id']  # Add database ID
+                return user
             return None
     
     def get_user_by_id(self, user_id):
@@ -127,48 +215,38 @@ class DatabaseManager:
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
+            cursor.execute(SQL_GET_USER_BY_ID, (user_id,))
             row = cursor.fetchone()
-            
+
             if row:
-                return User(
+                user = User(
                     name=row['name'],
                     email=row['email'],
                     password=row['password']
                 )
+                user.id = row['id']  # Add database ID
+                return user
             return None
     
     def update_user(self, user_id, name=None, email=None, password=None):
         """
-        Update user information.
-        
+        Update user information. Fields left as None keep their current
+        value via COALESCE, so the UPDATE statement is a single constant.
+
         Args:
             user_id (int): User's ID
             name (str, optional): New name
             email (str, optional): New email
             password (str, optional): New password
         """
-        updates = []
-        params = []
-        
-        if name:
-            updates.append('name = ?')
-            params.append(name)
-        if email:
-            updates.append('email = ?')
-            params.append(email)
-        if password:
-            updates.append('password = ?')
-            params.append(password)
-        
-        if updates:
-            params.append(user_id)
-            query = f"UPDATE users SET {', '.join(updates)} WHERE id = ?"
-            
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-                conn.commit()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute(SQL_UPDATE_USER,
+                           (name, email,
+                            hash_password(password) if password else None,
+                            user_id))
+            cursor.execute('COMMIT')
     
     def delete_user(self, user_id):
         """
@@ -179,8 +257,9 @@ class DatabaseManager:
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('DELETE FROM users WHERE id = ?', (user_id,))
-            conn.commit()
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute(SQL_DELETE_USER, (user_id,))
+            cursor.execute('COMMIT')
     
     # Trip operations
     def create_trip(self, user_id, city, state, country, start_date, end_date, trip_type):
@@ -201,32 +280,44 @@ class DatabaseManager:
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO trips (user_id, city, state, country, start_date, end_date, type)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (user_id, city, state, country, start_date, end_date, trip_type))
-            conn.commit()
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute(SQL_CREATE_TRIP,
+                           (user_id, city, state, country, start_date, end_date, trip_type))
+            cursor.execute('COMMIT')
             return cursor.lastrowid
     
     def get_user_trips(self, user_id):
         """
         Get all trips for a specific user.
-        
+
         Args:
             user_id (int): User's ID
+
+        Returns:
+            list: List of sqlite3.Row objects (templates read these
+            directly; no Trip instance is built per row)
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(SQL_GET_USER_TRIPS, (user_id,))
+            return cursor.fetchall()
+    
+    def get_trip_by_id(self, trip_id):
+        """
+        Get a specific trip by ID.
+        
+        Args:
+            trip_id (int): Trip's ID
             
         Returns:
-            list: List of Trip objects
+            Trip object or None if not found
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                SELECT * FROM trips WHERE user_id = ? ORDER BY created_at DESC
-            ''', (user_id,))
-            rows = cursor.fetchall()
+            cursor.execute(SQL_GET_TRIP_BY_ID, (trip_id,))
+            row = cursor.fetchone()
             
-            trips = []
-            for row in rows:
+            if row:
                 trip = Trip(
                     city=row['city'],
                     state=row['state'],
@@ -235,26 +326,26 @@ class DatabaseManager:
                     end_date=row['end_date'],
                     type=row['type']
                 )
-                trip.id = row['id']  # Add database ID
-                trips.append(trip)
-            
-            return trips
+                trip.id = row['id']
+                return trip
+            return None
     
-    def get_trip_by_id(self, trip_id):
+    def get_user_trip(self, trip_id, user_id):
         """
-        Get a specific trip by ID.
-        
+        Get a specific trip by ID, scoped to its owner.
+
         Args:
             trip_id (int): Trip's ID
-            
+            user_id (int): Owning user's ID
+
         Returns:
-            Trip object or None if not found
+            Trip object or None if not found or owned by another user
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM trips WHERE id = ?', (trip_id,))
+            cursor.execute(SQL_GET_USER_TRIP, (trip_id, user_id))
             row = cursor.fetchone()
-            
+
             if row:
                 trip = Trip(
                     city=row['city'],
@@ -267,12 +358,12 @@ class DatabaseManager:
                 trip.id = row['id']
                 return trip
             return None
-    
-    def update_trip(self, trip_id, city=None, state=None, country=None, 
+
+    def update_trip(self, trip_id, city=None, state=None, country=None,
                    start_date=None, end_date=None, trip_type=None):
         """
-        Update trip information.
-        
+        Update trip information. None arguments leave the column untouched.
+
         Args:
             trip_id (int): Trip's ID
             city (str, optional): New city
@@ -282,36 +373,13 @@ class DatabaseManager:
             end_date (str, optional): New end date
             trip_type (str, optional): New trip type
         """
-        updates = []
-        params = []
-        
-        if city:
-            updates.append('city = ?')
-            params.append(city)
-        if state:
-            updates.append('state = ?')
-            params.append(state)
-        if country:
-            updates.append('country = ?')
-            params.append(country)
-        if start_date:
-            updates.append('start_date = ?')
-            params.append(start_date)
-        if end_date:
-            updates.append('end_date = ?')
-            params.append(end_date)
-        if trip_type:
-            updates.append('type = ?')
-            params.append(trip_type)
-        
-        if updates:
-            params.append(trip_id)
-            query = f"UPDATE trips SET {', '.join(updates)} WHERE id = ?"
-            
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-                conn.commit()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute(SQL_UPDATE_TRIP,
+                           (city, state, country, start_date, end_date,
+                            trip_type, trip_id))
+            cursor.execute('COMMIT')
     
     def delete_trip(self, trip_id):
         """
@@ -322,41 +390,45 @@ class DatabaseManager:
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('DELETE FROM trips WHERE id = ?', (trip_id,))
-            conn.commit()
-    
-    def get_user_id_by_email(self, email):
-        """
-        Get user ID by email address.
-        
-        Args:
-            email (str): User's email
-            
-        Returns:
-            int: User ID or None if not found
-        """
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT id FROM users WHERE email = ?', (email,))
-            row = cursor.fetchone()
-            return row['id'] if row else None
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute(SQL_DELETE_TRIP, (trip_id,))
+            cursor.execute('COMMIT')
     
     def populate_sample_data(self):
         """
         Populate the database with sample data for testing.
+        Only seeds an empty database, and batches all inserts into a
+        single transaction (one commit instead of five).
         """
-        # Create sample users
-        will_id = self.create_user("Will Cox", "will@gmail.com", "password")
-        admin_id = self.create_user("Admin User", "admin@example.com", "admin123")
-        
-        if will_id:
-            # Add sample trips for Will Cox
-            self.create_trip(will_id, "Dallas", "Texas", "USA", "2024-06-01", "2024-06-07", "business")
-            self.create_trip(will_id, "Paris", "Île-de-France", "France", "2024-07-15", "2024-07-22", "leisure")
-        
-        if admin_id:
-            # Add sample trips for Admin User
-            self.create_trip(admin_id, "New York", "New York", "USA", "2024-05-20", "2024-05-25", "business")
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*) FROM users')
+            if cursor.fetchone()[0] > 0:
+                return  # Already seeded
+
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.executemany('''
+                INSERT INTO users (name, email, password)
+                VALUES (?, ?, ?)
+            ''', [
+                ("Will Cox", "will@gmail.com", hash_password("password")),
+                ("Admin User", "admin@example.com", hash_password("admin123")),
+            ])
+
+            cursor.execute('SELECT id, email FROM users')
+            user_ids = {row['email']: row['id'] for row in cursor.fetchall()}
+            will_id = user_ids["will@gmail.com"]
+            admin_id = user_ids["admin@example.com"]
+
+            cursor.executemany('''
+                INSERT INTO trips (user_id, city, state, country, start_date, end_date, type)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (will_id, "Dallas", "Texas", "USA", "2024-06-01", "2024-06-07", "business"),
+                (will_id, "Paris", "Île-de-France", "France", "2024-07-15", "2024-07-22", "leisure"),
+                (admin_id, "New York", "New York", "USA", "2024-05-20", "2024-05-25", "business"),
+            ])
+            cursor.execute('COMMIT')
 
 
 # Example usage and testing
@@ -373,7 +445,7 @@ if __name__ == "__main__":
     user = db.get_user_by_email("will@gmail.com")
     if user:
         print(f"Found user: {user.name} ({user.email})")
-        user_id = db.get_user_id_by_email("will@gmail.com")
+        user_id = user.id
         print(f"User ID: {user_id}")
     
     # Test trip operations
@@ -382,6 +454,6 @@ if __name__ == "__main__":
         trips = db.get_user_trips(user_id)
         print(f"User has {len(trips)} trips:")
         for trip in trips:
-            print(f"  - {trip}")
+            print(f"  - Trip to {trip['city']}, {trip['state']}, {trip['country']} ({trip['start_date']} to {trip['end_date']})")
     
     print("\n✅ Database integration test completed!")
@@ -2,7 +2,9 @@ class Trip:
     """
     A skeleton class for managing trip information.
     """
-    
+
+    __slots__ = ('id', 'city', 'state', 'country', 'start_date', 'end_date', 'type')
+
     def __init__(self, city=None, state=None, country=None, start_date=None, end_date=None, type=None):
         """
         Initialize a new Trip instance.
@@ -23,16 +25,6 @@ class Trip:
         self.end_date = end_date
         self.type = type
     
-    def get_duration(self):
-        """
-        Calculate the duration of the trip.
-        
-        Returns:
-            int: Duration in days (placeholder implementation)
-        """
-        # This is a placeholder - you would implement actual date calculation
-        return 0
-    
     def __str__(self):
         """
         Return a string representation of the trip.